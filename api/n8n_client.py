@@ -4,15 +4,50 @@ import os
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import orjson
 import requests
+import streamlit as st
+from requests_toolbelt import MultipartEncoder
+from urllib3.util import Retry
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_EMPTY_JSON = b"{}"
+# ETag cache bound: the refetch-style endpoints cycle through a handful of
+# (URL, body) pairs, but chat sends a distinct body per prompt — without a
+# cap an ETag-emitting workflow would grow the cache for the process
+# lifetime of the cache_resource singleton.
+_ETAG_CACHE_MAX = 128
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class N8NConfig:
     base_url: str
     api_key: Optional[str] = None
 
 
+@dataclass(frozen=True, slots=True)
+class N8NWebhookConfig:
+    """Full webhook URLs, resolved from the environment once per client."""
+
+    chat: Optional[str] = None
+    ingest: Optional[str] = None
+    incidents: Optional[str] = None
+    kpis: Optional[str] = None
+    tracker: Optional[str] = None
+    status: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "N8NWebhookConfig":
+        return cls(
+            chat=os.getenv("N8N_CHAT_WEBHOOK_URL") or None,
+            ingest=os.getenv("N8N_INGEST_WEBHOOK_URL") or None,
+            incidents=os.getenv("N8N_INCIDENTS_WEBHOOK_URL") or None,
+            kpis=os.getenv("N8N_KPI_WEBHOOK_URL") or None,
+            tracker=os.getenv("N8N_TRACKER_WEBHOOK_URL") or None,
+            status=os.getenv("N8N_STATUS_WEBHOOK_URL") or None,
+        )
+
+
 class N8NClient:
     """Small helper for calling n8n's REST API and webhooks.
 
@@ -29,15 +64,51 @@ class N8NClient:
             )
 
         self.config = config
+        self.webhooks = N8NWebhookConfig.from_env()
         self.timeout_s = timeout_s
+        # Absolute URLs are immutable after construction; precompute the
+        # fixed ones so hot-path calls skip per-call string work.
+        self._health_url = f"{config.base_url}/healthz"
         self._session = requests.Session()
+        # Ask n8n (or the proxy in front of it) to compress text-heavy JSON
+        # bodies; requests decompresses transparently on read. Only gzip:
+        # urllib3 decodes br solely when a brotli package is importable,
+        # and this project does not depend on one — advertising it would
+        # hand orjson still-compressed bytes behind a brotli-capable proxy.
+        self._session.headers.update(
+            {"Accept-Encoding": "gzip", "Accept": "application/json"}
+        )
+
+        # Default urllib3 pools hold 10 sockets; concurrent Streamlit sessions
+        # hitting the same n8n host would thrash past that and repay the
+        # TCP+TLS handshake. Size the keep-alive pool generously and retry
+        # transient upstream errors.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
         if self.config.api_key:
             self._session.headers.update({"X-N8N-API-KEY": self.config.api_key})
 
+        # Last ETag and decoded payload per (webhook URL, request body);
+        # lets call_webhook revalidate with If-None-Match and answer 304s
+        # from memory instead of re-downloading unchanged responses.
+        # Capped at _ETAG_CACHE_MAX entries, evicting least recently used
+        # (insertion order doubles as recency: hits reinsert their key).
+        self._etag_cache: Dict[tuple[str, bytes], tuple[str, Dict[str, Any]]] = {}
+
     def health_check(self) -> bool:
         try:
-            resp = self._session.get(f"{self.config.base_url}/healthz", timeout=self.timeout_s)
+            resp = self._session.get(self._health_url, timeout=self.timeout_s)
             return resp.ok
         except requests.RequestException:
             return False
@@ -47,25 +118,135 @@ class N8NClient:
             f"{self.config.base_url}/{path.lstrip('/')}", params=params, timeout=self.timeout_s
         )
         resp.raise_for_status()
-        return resp.json()
+        # orjson parses straight from bytes, skipping resp.json()'s utf-8
+        # str decode and the slower stdlib parser.
+        return orjson.loads(resp.content)
 
-    def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def post(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         resp = self._session.post(
-            f"{self.config.base_url}/{path.lstrip('/')}", json=payload, timeout=self.timeout_s
+            f"{self.config.base_url}/{path.lstrip('/')}",
+            data=orjson.dumps(payload) if payload else _EMPTY_JSON,
+            headers=_JSON_HEADERS,
+            timeout=self.timeout_s,
         )
         resp.raise_for_status()
         if not resp.content:
             return {}
-        return resp.json()
+        return orjson.loads(resp.content)
 
-    def call_webhook(self, webhook_url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call an n8n webhook URL (full URL)."""
-        resp = self._session.post(webhook_url, json=payload, timeout=self.timeout_s)
-        resp.raise_for_status()
+    @staticmethod
+    def unwrap_payload(payload: Any) -> Any:
+        """Peel the wrapper shapes n8n webhooks respond with.
+
+        Workflows commonly wrap the real result as ``{"output": ...}``,
+        ``{"data": ...}``, ``{"json": ...}`` or a one-item list, at most a
+        couple of layers deep. Unwrapping here means cached fetch results
+        are already clean and render code never re-walks the payload.
+        """
+        for _ in range(3):
+            if isinstance(payload, list) and len(payload) == 1:
+                payload = payload[0]
+                continue
+            if isinstance(payload, dict):
+                for key in ("output", "data", "json"):
+                    inner = payload.get(key)
+                    if isinstance(inner, (dict, list)):
+                        payload = inner
+                        break
+                else:
+                    break
+                continue
+            break
+        return payload
+
+    @staticmethod
+    def _json_or_text(resp: requests.Response) -> Dict[str, Any]:
+        """Decode a webhook response without a speculative JSON parse.
+
+        Branching on Content-Type avoids the try/except round of feeding
+        plain-text bodies to the JSON parser, and orjson decodes straight
+        from bytes without the bytes-to-str copy resp.json() would make.
+        """
         if not resp.content:
             return {}
-        # webhooks sometimes return plain text
-        try:
-            return resp.json()
-        except ValueError:
-            return {"text": resp.text}
+        if "json" in resp.headers.get("content-type", ""):
+            payload = orjson.loads(resp.content)
+            return payload if isinstance(payload, dict) else {"data": payload}
+        return {"text": resp.text}
+
+    def call_webhook(
+        self, webhook_url: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Call an n8n webhook URL (full URL).
+
+        Sends ``If-None-Match`` when a previous call for the same URL and
+        body returned an ETag; a 304 answer is served from the in-memory
+        copy, turning most refresh cycles into near-zero-byte round-trips.
+        """
+        body = orjson.dumps(payload) if payload else _EMPTY_JSON
+        cache_key = (webhook_url, body)
+        cached = self._etag_cache.get(cache_key)
+        headers = (
+            {**_JSON_HEADERS, "If-None-Match": cached[0]} if cached else _JSON_HEADERS
+        )
+        resp = self._session.post(
+            webhook_url, data=body, headers=headers, timeout=self.timeout_s
+        )
+        if resp.status_code == 304 and cached:
+            # Reinsert to refresh recency; steadily revalidated entries
+            # must outlive one-shot chat bodies under eviction.
+            self._etag_cache.pop(cache_key, None)
+            self._etag_cache[cache_key] = cached
+            return cached[1]
+        resp.raise_for_status()
+        result = self._json_or_text(resp)
+        etag = resp.headers.get("ETag")
+        if etag:
+            cache = self._etag_cache
+            cache.pop(cache_key, None)
+            cache[cache_key] = (etag, result)
+            if len(cache) > _ETAG_CACHE_MAX:
+                cache.pop(next(iter(cache)))
+        return result
+
+    def call_webhook_file(
+        self,
+        webhook_url: str,
+        fileobj: Any,
+        filename: str,
+        fields: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Stream a file to an n8n webhook as multipart form data.
+
+        The body is read from ``fileobj`` as it is transmitted, so memory
+        stays O(chunk) instead of O(file) and transmission overlaps the read
+        — important for large EDI drops.
+        """
+        encoder = MultipartEncoder(
+            fields={
+                **(fields or {}),
+                "file": (filename, fileobj, "application/octet-stream"),
+            }
+        )
+        resp = self._session.post(
+            webhook_url,
+            data=encoder,
+            headers={"Content-Type": encoder.content_type},
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return self._json_or_text(resp)
+
+
+@st.cache_resource(show_spinner=False)
+def get_default_client() -> N8NClient:
+    """Shared `N8NClient` reused across Streamlit reruns and sessions.
+
+    Constructing a client per rerun throws away the underlying
+    `requests.Session` (and its keep-alive connection pool) on every widget
+    interaction; caching the instance keeps warm sockets to the n8n host.
+
+    The client snapshots its env vars at construction; after changing
+    N8N_* settings call ``st.cache_resource.clear()`` to rebuild it.
+    """
+    return N8NClient()
@@ -1,34 +1,55 @@
-import os
-from typing import Callable, Dict
+from dataclasses import dataclass
+from typing import Callable
 
 import streamlit as st
 
+from auth.roles import Permission, Role, get_current_role, has_permission
 from ui.chatbot import render as render_chatbot
 from ui.upload import render as render_upload
 from ui.kpis import render as render_kpis
 from ui.incidents import render as render_incidents
+from ui.tracker import render as render_tracker
 
 
-def _sidebar_role_badge() -> None:
-    role = os.getenv("EDI_ROLE", "viewer")
-    st.sidebar.caption(f"Role: **{role}**")
+@dataclass(frozen=True, slots=True)
+class Page:
+    label: str
+    permission: Permission
+    render: Callable[[], None]
+
+
+_ALL_PAGES = (
+    Page("KPIs", Permission.view, render_kpis),
+    Page("Upload", Permission.upload, render_upload),
+    Page("Incidents", Permission.view, render_incidents),
+    Page("Tracker", Permission.view, render_tracker),
+    Page("Chatbot", Permission.view, render_chatbot),
+)
+
+# Visibility is a pure function of the role enum; precompute it at import so
+# each rerun does a single dict lookup instead of N permission checks.
+_PAGES_BY_ROLE = {
+    role: tuple(p for p in _ALL_PAGES if has_permission(p.permission, role)) for role in Role
+}
+_RENDERERS_BY_ROLE = {
+    role: {p.label: p.render for p in pages} for role, pages in _PAGES_BY_ROLE.items()
+}
+
+
+def _sidebar_role_badge(role: Role) -> None:
+    st.sidebar.caption(f"Role: **{role.value}**")
 
 
 def main() -> None:
     st.set_page_config(page_title="EDI Control Tower", layout="wide")
 
     st.sidebar.title("EDI Control Tower")
-    _sidebar_role_badge()
-
-    pages: Dict[str, Callable[[], None]] = {
-        "KPIs": render_kpis,
-        "Upload": render_upload,
-        "Incidents": render_incidents,
-        "Chatbot": render_chatbot,
-    }
+    role = get_current_role()
+    _sidebar_role_badge(role)
 
-    page = st.sidebar.radio("Navigate", list(pages.keys()), index=0)
-    pages[page]()
+    renderers = _RENDERERS_BY_ROLE[role]
+    page = st.sidebar.radio("Navigate", list(renderers.keys()), index=0)
+    renderers[page]()
 
 
 if __name__ == "__main__":
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import os
 from enum import Enum
-from typing import Iterable, Set
+from functools import lru_cache
+from typing import FrozenSet, Iterable
 
 
 class Role(str, Enum):
@@ -19,27 +20,36 @@ class Permission(str, Enum):
 
 
 _ROLE_PERMISSIONS = {
-    Role.viewer: {Permission.view},
-    Role.operator: {Permission.view, Permission.upload, Permission.manage_incidents},
-    Role.admin: {
-        Permission.view,
-        Permission.upload,
-        Permission.manage_incidents,
-        Permission.configure,
-    },
+    Role.viewer: frozenset({Permission.view}),
+    Role.operator: frozenset({Permission.view, Permission.upload, Permission.manage_incidents}),
+    Role.admin: frozenset(
+        {
+            Permission.view,
+            Permission.upload,
+            Permission.manage_incidents,
+            Permission.configure,
+        }
+    ),
 }
 
+_VIEW_ONLY = frozenset({Permission.view})
 
-def get_current_role() -> Role:
-    raw = (os.getenv("EDI_ROLE", Role.viewer.value) or Role.viewer.value).strip().lower()
+
+@lru_cache(maxsize=None)
+def _parse_role(raw: str) -> Role:
     try:
         return Role(raw)
     except ValueError:
         return Role.viewer
 
 
-def permissions_for(role: Role) -> Set[Permission]:
-    return set(_ROLE_PERMISSIONS.get(role, {Permission.view}))
+def get_current_role() -> Role:
+    raw = (os.getenv("EDI_ROLE", Role.viewer.value) or Role.viewer.value).strip().lower()
+    return _parse_role(raw)
+
+
+def permissions_for(role: Role) -> FrozenSet[Permission]:
+    return _ROLE_PERMISSIONS.get(role, _VIEW_ONLY)
 
 
 def has_permission(permission: Permission, role: Role | None = None) -> bool:
@@ -1,22 +1,135 @@
 from __future__ import annotations
 
-import os
+import json
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import streamlit as st
 
-from api.n8n_client import N8NClient
+if TYPE_CHECKING:
+    import pandas as pd
+
+from api.n8n_client import get_default_client
+
+# Bound stored history: every rerun re-renders all messages, so an unbounded
+# list makes each keystroke O(session length) in DOM and Markdown work.
+_MAX_MESSAGES = 200
+
+_KEY_PRIORITY = {"answer": 0, "response": 1, "message": 2, "text": 3}
+_NO_MATCH = len(_KEY_PRIORITY) + 1
+
+_PREFERRED_COLS = ("document_id", "document_type", "partner", "status", "severity", "summary")
 
 
 def _ensure_messages() -> None:
-    st.session_state.setdefault(
-        "chat_messages",
-        [
-            {
-                "role": "assistant",
-                "content": "Ask me about uploads, incidents, or overall status.",
-            }
-        ],
+    if "chat_messages" not in st.session_state:
+        st.session_state.chat_messages = deque(
+            [
+                {
+                    "role": "assistant",
+                    "content": "Ask me about uploads, incidents, or overall status.",
+                }
+            ],
+            maxlen=_MAX_MESSAGES,
+        )
+
+
+def _extract_answer(resp: Dict[str, Any]) -> str:
+    # Single pass over the payload instead of one hash lookup per
+    # candidate key; priority keeps "answer" winning over "text".
+    best_priority = _NO_MATCH
+    best: Optional[str] = None
+    for key, value in resp.items():
+        priority = _KEY_PRIORITY.get(key, _NO_MATCH)
+        if priority < best_priority and isinstance(value, str) and value.strip():
+            best_priority = priority
+            best = value.strip()
+            if priority == 0:
+                break
+    return best if best is not None else str(resp)
+
+
+def _is_nonempty_item(item: Any) -> bool:
+    # Dispatch on the concrete type once; the common cases (str, dict)
+    # each resolve with a single check instead of chained equality tests.
+    if item is None:
+        return False
+    kind = type(item)
+    if kind is str:
+        return bool(item.strip())
+    if kind is dict:
+        return bool(item)
+    return True
+
+
+def _is_effectively_empty_list(val: Any) -> bool:
+    # any(map(...)) keeps the scan in C and exits on the first real item.
+    return not isinstance(val, list) or not any(map(_is_nonempty_item, val))
+
+
+def _structured_details(resp: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Pull a list-of-dicts table out of a webhook answer, if it has one."""
+    for key in ("details", "results", "documents", "incidents", "rows"):
+        val = resp.get(key)
+        if isinstance(val, list) and not _is_effectively_empty_list(val):
+            if all(isinstance(item, dict) for item in val):
+                return val
+    return None
+
+
+@st.cache_data(show_spinner=False)
+def _details_to_df(details_key: str) -> pd.DataFrame:
+    """Build (and cache) the table for a structured answer.
+
+    The chat history replays every message on every rerun; caching on the
+    serialized payload means pandas construction happens once per distinct
+    table instead of once per keystroke.
+    """
+    # Deferred: pandas costs ~100ms/50MB at import and most chats never
+    # produce a table. Python caches the module after first use.
+    import pandas as pd
+
+    details = json.loads(details_key)
+    df = pd.DataFrame(details)
+    # Intersect from the preferred side so its order wins, and keep the
+    # leftovers in payload order (sort=False) instead of alphabetized.
+    preferred = pd.Index(_PREFERRED_COLS)
+    cols = preferred.intersection(df.columns, sort=False).append(
+        df.columns.difference(preferred, sort=False)
     )
+    return df.reindex(columns=cols, copy=False)
+
+
+def _render_structured_payload(message: Dict[str, Any]) -> None:
+    payload = message.get("payload")
+    if not payload:
+        return
+
+    # History replays on every rerun; render each message from artifacts
+    # computed once and cached on the message dict, so redraw cost stays
+    # O(1) in the raw payload.
+    findings_md = message.get("_findings_md")
+    if findings_md is None:
+        findings = payload.get("findings")
+        if _is_effectively_empty_list(findings):
+            findings_md = ""
+        else:
+            findings_md = "\n".join(
+                f"- {item.strip() if isinstance(item, str) else item}" for item in findings if item
+            )
+        message["_findings_md"] = findings_md
+    if findings_md:
+        st.caption("Findings")
+        st.markdown(findings_md)
+
+    df = message.get("_df")
+    if df is None and "_df" not in message:
+        details = _structured_details(payload)
+        if details is not None:
+            df = _details_to_df(json.dumps(details, sort_keys=True, default=str))
+        message["_df"] = df
+    if df is not None:
+        st.dataframe(df, use_container_width=True, hide_index=True)
 
 
 def render() -> None:
@@ -27,6 +140,8 @@ def render() -> None:
     for m in st.session_state.chat_messages:
         with st.chat_message(m["role"]):
             st.write(m["content"])
+            if m["role"] == "assistant":
+                _render_structured_payload(m)
 
     prompt = st.chat_input("Type a message")
     if not prompt:
@@ -36,14 +151,19 @@ def render() -> None:
     with st.chat_message("user"):
         st.write(prompt)
 
-    webhook = os.getenv("N8N_CHAT_WEBHOOK_URL")
+    client = get_default_client()
+    webhook = client.webhooks.chat
 
     with st.chat_message("assistant"):
+        payload: Optional[Dict[str, Any]] = None
         if webhook:
             try:
-                client = N8NClient()
                 resp = client.call_webhook(webhook, {"message": prompt})
-                answer = resp.get("answer") or resp.get("text") or str(resp)
+                answer = _extract_answer(resp)
+                if _structured_details(resp) is not None or not _is_effectively_empty_list(
+                    resp.get("findings")
+                ):
+                    payload = resp
             except Exception as e:  # noqa: BLE001
                 answer = f"I couldn't reach n8n: {e}"
         else:
@@ -55,6 +175,10 @@ def render() -> None:
                 "Set N8N_CHAT_WEBHOOK_URL to enable workflow-backed answers."
             )
 
+        message: Dict[str, Any] = {"role": "assistant", "content": answer}
+        if payload is not None:
+            message["payload"] = payload
         st.write(answer)
+        _render_structured_payload(message)
 
-    st.session_state.chat_messages.append({"role": "assistant", "content": answer})
+    st.session_state.chat_messages.append(message)
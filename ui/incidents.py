@@ -1,13 +1,225 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import pandas as pd
 import streamlit as st
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+from api.n8n_client import get_default_client
 from auth.roles import Permission, has_permission
 
 
+@lru_cache(maxsize=1)
+def _demo_incidents() -> List[Dict[str, Any]]:
+    # Allocated once per process; demo mode reruns per keystroke and the
+    # page never mutates items, so sharing the list is safe.
+    return [
+        {
+            "id": "INC-1001",
+            "severity": "high",
+            "status": "open",
+            "summary": "997 functional acks missing for ACME",
+            "partner": "ACME",
+            "created_at": "2026-08-24T09:15:00+00:00",
+            "details": {
+                "document_type": "997",
+                "impact": "Outbound 850s unacknowledged for 6 hours",
+                "next_steps": ["Check AS2 channel", "Replay failed transmissions"],
+                "ai_triage": {
+                    "likely_cause": "Partner gateway outage",
+                    "confidence": 0.82,
+                },
+            },
+        },
+        {
+            "id": "INC-1002",
+            "severity": "medium",
+            "status": "ack",
+            "summary": "Late 214 status updates from Globex",
+            "partner": "Globex",
+            "created_at": "2026-08-25T14:40:00+00:00",
+            "details": {
+                "document_type": "214",
+                "impact": "Shipment visibility delayed ~45 minutes",
+                "ai_triage": {
+                    "likely_cause": "Batch window misconfiguration",
+                    "confidence": 0.64,
+                },
+            },
+        },
+        {
+            "id": "INC-1003",
+            "severity": "low",
+            "status": "resolved",
+            "summary": "Duplicate 810 invoice from Initech",
+            "partner": "Initech",
+            "created_at": "2026-08-25T18:05:00+00:00",
+            "details": {"document_type": "810", "impact": "None, dedup caught it"},
+        },
+    ]
+
+
+def _normalize_incidents(payload: Any) -> List[Dict[str, Any]]:
+    # filter() dispatches the per-item type check in C instead of an
+    # interpreted comprehension — payloads can be large.
+    if isinstance(payload, list):
+        return list(filter(dict.__instancecheck__, payload))
+    if isinstance(payload, dict):
+        for key in ("incidents", "data", "items", "results"):
+            val = payload.get(key)
+            if isinstance(val, list):
+                return list(filter(dict.__instancecheck__, val))
+    return []
+
+
+@st.cache_data(show_spinner=False)
+def _incidents_df(n: int, fingerprint: int, _data: tuple) -> pd.DataFrame:
+    """Session-log table, rebuilt only when the incident list changes.
+
+    The list is append-only, so (length, created_at fingerprint) is a
+    stable cheap cache key; the underscore prefix keeps Streamlit from
+    pickle-hashing the incident dicts themselves on every lookup.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(list(_data))
+
+
+def _freeze_filters(filters: Dict[str, Any]) -> tuple:
+    """Stable, cheap-to-hash cache key: sorted (key, value) pairs.
+
+    Streamlit hashes dict arguments by deep introspection on every cache
+    lookup; a flat tuple hashes in O(len) and is insensitive to key order.
+    """
+    return tuple(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in sorted(filters.items())
+        if v is not None
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_incidents(filters_key: tuple) -> List[Dict[str, Any]]:
+    client = get_default_client()
+    webhook = client.webhooks.incidents
+    if not webhook:
+        return []
+    try:
+        return _normalize_incidents(client.call_webhook(webhook, dict(filters_key)))
+    except Exception:  # noqa: BLE001
+        return []
+
+
+_SEARCH_KEYS = ("id", "summary", "title", "status", "severity", "partner", "details")
+
+_EMPTY: Dict[str, Any] = {}
+
+
+def _partner(inc: Dict[str, Any]) -> Any:
+    return inc.get("partner") or (inc.get("details") or _EMPTY).get("partner", "—")
+
+
+@st.cache_data(show_spinner=False)
+def _build_search_index(payload_json: str) -> List[str]:
+    """One lowercased haystack per incident, cached on the raw payload.
+
+    The search box reruns the page per keystroke; without this each
+    keystroke pays several str()+lower() calls per incident.
+    """
+    incidents = json.loads(payload_json)
+    # casefold() is Unicode-correct and slightly faster than lower().
+    return [" ".join(str(i.get(k, "")) for k in _SEARCH_KEYS).casefold() for i in incidents]
+
+
+def _incident_title(inc: Dict[str, Any]) -> str:
+    severity = str(inc.get("severity", "info")).upper()
+    summary = inc.get("summary") or inc.get("title") or "Incident"
+    status = inc.get("status", "open")
+    inc_id = inc.get("id", "")
+    return f"[{severity}] {summary} — {status} {inc_id}".rstrip()
+
+
+def _render_details(details: Dict[str, Any]) -> None:
+    ai_triage = details.get("ai_triage")
+    if isinstance(ai_triage, dict):
+        st.subheader("AI triage")
+        st.json(ai_triage)
+
+    # Iterate directly instead of rebuilding the dict just to drop one key;
+    # the subheader is emitted lazily on the first rendered entry.
+    emitted_header = False
+    for key, value in details.items():
+        if key == "ai_triage":
+            continue
+        if not emitted_header:
+            st.subheader("Details")
+            emitted_header = True
+        label = key.replace("_", " ").title()
+        if isinstance(value, list):
+            # One markdown delta instead of one per bullet — each
+            # st.write is a separate script-to-frontend message.
+            bullets = "\n".join(f"- {item}" for item in value if item)
+            st.markdown(f"**{label}**\n{bullets}")
+        else:
+            st.write(f"**{label}:** {value}")
+
+
+def _render_drilldown() -> None:
+    st.subheader("Drill-down")
+
+    client = get_default_client()
+    webhook_configured = client.webhooks.incidents is not None
+
+    top = st.columns([1, 1, 2])
+    use_demo = top[0].toggle("Demo data", value=not webhook_configured)
+    status = top[1].selectbox("Status", ["any", "open", "ack", "resolved"], index=0)
+    query = top[2].text_input("Search", placeholder="id, summary, partner, …")
+
+    if use_demo:
+        incidents = _demo_incidents()
+        if status != "any":
+            incidents = [i for i in incidents if i.get("status") == status]
+    else:
+        # The webhook filters by status server-side; re-filtering here would
+        # be a second full traversal for nothing.
+        incidents = _fetch_incidents(
+            _freeze_filters({"status": None if status == "any" else status})
+        )
+
+    q = query.strip().casefold()
+    if q:
+        index = _build_search_index(json.dumps(incidents, default=str))
+        incidents = [inc for inc, blob in zip(incidents, index) if q in blob]
+
+    st.caption(f"{len(incidents)} incident(s)")
+
+    for idx, inc in enumerate(incidents):
+        with st.expander(_incident_title(inc), expanded=False):
+            cols = st.columns(4)
+            cols[0].metric("Severity", str(inc.get("severity", "—")))
+            cols[1].metric("Status", str(inc.get("status", "—")))
+            cols[2].metric("Partner", str(_partner(inc)))
+            cols[3].metric("Created", str(inc.get("created_at", "—"))[:10])
+
+            # Collapsed expanders still serialize every inner widget on each
+            # rerun, so the heavy payload rendering is opt-in per incident.
+            inc_key = inc.get("id") or f"row{idx}"
+            if st.checkbox("Show details", key=f"inc_details_{inc_key}"):
+                details = inc.get("details")
+                if isinstance(details, dict):
+                    _render_details(details)
+
+                # The full payload embeds details again; only serialize it
+                # when explicitly requested.
+                if st.checkbox("Raw payload", key=f"inc_raw_{inc_key}"):
+                    st.json(inc)
+
+
 def render() -> None:
     st.title("Incidents")
 
@@ -36,11 +248,22 @@ def render() -> None:
                 )
                 st.success("Incident created")
 
-    st.subheader("Incident log")
+    st.divider()
+
+    _render_drilldown()
+
+    st.divider()
+
+    st.subheader("Incident log (this session)")
 
     if not st.session_state.incidents:
         st.caption("No incidents yet.")
         return
 
-    df = pd.DataFrame(st.session_state.incidents)
+    session_incidents = st.session_state.incidents
+    df = _incidents_df(
+        len(session_incidents),
+        hash(tuple(i["created_at"] for i in session_incidents)),
+        tuple(session_incidents),
+    )
     st.dataframe(df, use_container_width=True, hide_index=True)
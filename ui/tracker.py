@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, Iterator, List
+
+import orjson
+import streamlit as st
+
+from api.n8n_client import get_default_client
+
+# Static widget options and column orderings; tuples at module scope so
+# reruns neither rebuild the lists nor re-hash fresh objects.
+_PREFERRED_COLS = ("doc_id", "partner", "type", "status", "received_at", "last_update")
+_PREFERRED_SET = frozenset(_PREFERRED_COLS)
+_DOC_TYPES = ("Any", "850", "855", "856", "940", "945", "997")
+_STATUSES = ("Any", "queued", "processing", "processed", "exception", "failed")
+
+
+# Demo fixtures are static; build them once at import instead of on every
+# rerun. Callers get a fresh list but share the underlying dicts.
+_DEMO_DOCUMENTS: List[Dict[str, Any]] = [
+    {
+        "doc_id": "DOC-850-1001",
+        "partner": "ACME",
+        "type": "850",
+        "status": "processed",
+        "received_at": "2026-08-25T08:02:00+00:00",
+        "last_update": "2026-08-25T08:04:12+00:00",
+        "events": ["Received", "Validated", "Translated", "Delivered"],
+        "references": ["PO-44210"],
+    },
+    {
+        "doc_id": "DOC-856-2002",
+        "partner": "Globex",
+        "type": "856",
+        "status": "exception",
+        "received_at": "2026-08-25T11:30:00+00:00",
+        "last_update": "2026-08-25T11:31:45+00:00",
+        "events": ["Received", "Validation failed"],
+        "errors": ["Missing HL loop for pallet level"],
+    },
+    {
+        "doc_id": "DOC-997-3003",
+        "partner": "Initech",
+        "type": "997",
+        "status": "queued",
+        "received_at": "2026-08-26T07:15:00+00:00",
+        "last_update": "2026-08-26T07:15:00+00:00",
+        "events": ["Received"],
+    },
+]
+
+
+def _demo_documents() -> List[Dict[str, Any]]:
+    return list(_DEMO_DOCUMENTS)
+
+
+_WRAPPER_KEYS = ("documents", "items", "data", "output", "json")
+
+
+def _unwrap_n8n_items(payload: Any) -> List[Any]:
+    """Flatten the wrapper shapes n8n webhooks wrap document lists in.
+
+    Iterative on an explicit deque rather than recursive: no Python frame
+    per nesting level, which matters since this runs on every fetch.
+    """
+    items: List[Any] = []
+    pending = deque((payload,))
+    while pending:
+        node = pending.popleft()
+        node_type = type(node)
+        if node_type is dict:
+            for key in _WRAPPER_KEYS:
+                inner = node.get(key)
+                if type(inner) in (dict, list):
+                    pending.appendleft(inner)
+                    break
+            else:
+                items.append(node)
+        elif node_type is list:
+            # Preserve order: prepend children so they drain before
+            # whatever else is queued.
+            pending.extendleft(reversed(node))
+    return items
+
+
+def _iter_documents(payload: Any) -> Iterator[Dict[str, Any]]:
+    """Yield document dicts lazily; callers that need one record can stop
+    after the first without materializing the rest."""
+    return (item for item in _unwrap_n8n_items(payload) if isinstance(item, dict))
+
+
+def _normalize_documents(payload: Any) -> List[Dict[str, Any]]:
+    return list(_iter_documents(payload))
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_documents(filters_key: frozenset) -> List[Dict[str, Any]]:
+    # A frozenset of (key, value) pairs hashes in O(k) and makes
+    # equivalent-but-differently-ordered filter dicts share one cache
+    # entry, unlike a plain dict arg that Streamlit must pickle-walk.
+    client = get_default_client()
+    webhook = client.webhooks.tracker
+    if not webhook:
+        return []
+    try:
+        return _normalize_documents(client.call_webhook(webhook, dict(filters_key)))
+    except Exception:  # noqa: BLE001
+        return []
+
+
+@st.cache_data(show_spinner=False)
+def _table_rows(docs_json: bytes) -> List[Dict[str, Any]]:
+    """Project documents into table rows, reused across reruns.
+
+    Keyed on the orjson-serialized document list, so toggling widgets
+    that leave the documents unchanged skips the key-union and
+    projection passes. st.dataframe accepts the list of dicts directly:
+    for the typical handful of documents, skipping pandas construction
+    (block manager + dtype inference) is the dominant saving.
+    """
+    documents = orjson.loads(docs_json)
+    all_keys = dict.fromkeys(k for d in documents for k in d)
+    ordered_keys = [k for k in _PREFERRED_COLS if k in all_keys] + [
+        k for k in all_keys if k not in _PREFERRED_SET
+    ]
+    return [{k: d.get(k) for k in ordered_keys} for d in documents]
+
+
+# Alias table for the field names different n8n workflows emit; resolved
+# once per document instead of or-chained dict probes at every use site.
+_ALIASES = {
+    "status": ("status", "state", "document_status"),
+    "type": ("type", "doc_type", "document_type"),
+    "partner": ("partner", "trading_partner"),
+    "received_at": ("received_at", "created_at"),
+    "last_update": ("last_update", "updated_at"),
+}
+
+
+def _canonicalize(doc: Dict[str, Any]) -> Dict[str, Any]:
+    resolved = {
+        canon: next((doc[k] for k in keys if k in doc), None)
+        for canon, keys in _ALIASES.items()
+    }
+    return {**doc, **{k: v for k, v in resolved.items() if v is not None}}
+
+
+def _render_kv(label: str, value: Any) -> None:
+    # Values are almost always str already; skip the redundant str() call
+    # and let the f-string convert the stragglers.
+    st.write(f"**{label}:** {value}")
+
+
+@st.cache_data(show_spinner=False)
+def _section_bullets(items: List[Any]) -> str:
+    """Markdown bullets for one section, built once per unique item list.
+
+    Reruns from selectbox or toggle changes revisit the same document;
+    caching the string build means only the st.markdown emit repeats.
+    """
+    # Single generator pass straight into join: no intermediate list.
+    return "\n".join(
+        f"- {text}"
+        for text in (str(item).strip() for item in items if item is not None)
+        if text
+    )
+
+
+def _render_list_section(title: str, items: Any) -> None:
+    if not isinstance(items, list) or not items:
+        return
+    bullets = _section_bullets(items)
+    if bullets:
+        st.markdown(f"**{title}**")
+        st.markdown(bullets)
+
+
+# Detail sections as (title, key aliases) pairs; one loop below instead of
+# six near-identical call sites.
+_LIST_SECTIONS = (
+    ("Events", ("events",)),
+    ("Errors", ("errors",)),
+    ("Warnings", ("warnings",)),
+    ("Acknowledgements", ("acks", "acknowledgements")),
+    ("References", ("references",)),
+    ("Notes", ("notes",)),
+)
+
+
+def _render_document_human(doc: Dict[str, Any]) -> None:
+    # Expects a _canonicalize()d doc: every field is a single-key access.
+    _render_kv("Status", doc.get("status") or "unknown")
+    _render_kv("Type", doc.get("type") or "—")
+    _render_kv("Partner", doc.get("partner") or "—")
+    _render_kv("Received", doc.get("received_at") or "—")
+    _render_kv("Last update", doc.get("last_update") or "—")
+
+    for title, keys in _LIST_SECTIONS:
+        items = next((doc[k] for k in keys if k in doc), None)
+        _render_list_section(title, items)
+
+
+def render() -> None:
+    st.title("Tracker")
+
+    client = get_default_client()
+    webhook_configured = client.webhooks.tracker is not None
+
+    top = st.columns([1, 1, 1, 1])
+    use_demo = top[0].toggle("Demo data", value=not webhook_configured)
+    doc_type = top[1].selectbox("Doc type", _DOC_TYPES, index=0)
+    status = top[2].selectbox("Status", _STATUSES, index=0)
+    partner = top[3].text_input("Partner", placeholder="Any")
+
+    if use_demo:
+        documents = _demo_documents()
+        if doc_type != "Any":
+            documents = [d for d in documents if d.get("type") == doc_type]
+        if status != "Any":
+            documents = [d for d in documents if d.get("status") == status]
+        if partner.strip():
+            p = partner.strip().casefold()
+            documents = [d for d in documents if p in str(d.get("partner", "")).casefold()]
+    else:
+        filters = {
+            "doc_type": None if doc_type == "Any" else doc_type,
+            "status": None if status == "Any" else status,
+            "partner": partner.strip() or None,
+        }
+        documents = _fetch_documents(
+            frozenset((k, v) for k, v in filters.items() if v is not None)
+        )
+
+    if not documents:
+        st.caption("No documents. Set N8N_TRACKER_WEBHOOK_URL or use demo data.")
+        return
+
+    st.dataframe(
+        _table_rows(orjson.dumps(documents)), use_container_width=True, hide_index=True
+    )
+
+    st.subheader("Document detail")
+    # O(1) lookup on rerun instead of re-scanning the document list every
+    # widget interaction.
+    doc_by_id = {str(d.get("doc_id", f"doc-{i}")): d for i, d in enumerate(documents)}
+    selected = st.selectbox("Document", list(doc_by_id.keys()), index=0)
+    doc = _canonicalize(doc_by_id.get(selected) or next(iter(doc_by_id.values())))
+
+    _render_document_human(doc)
+
+    with st.expander("Raw payload", expanded=False):
+        # st.json walks the dict recursively and serializes with stdlib
+        # json; for big documents, pre-serialize with orjson and ship one
+        # code block instead. Small docs keep the interactive JSON widget.
+        raw = orjson.dumps(doc, option=orjson.OPT_INDENT_2)
+        if len(raw) > 16_384:
+            st.code(raw.decode(), language="json")
+        else:
+            st.json(doc)
@@ -1,12 +1,513 @@
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
 
 from auth.roles import Permission, has_permission
-from api.n8n_client import N8NClient
+from api.n8n_client import get_default_client
+
+_PIPELINE_POLL_INTERVAL_S = 3
+_PIPELINE_MAX_WAIT_S = 90
+_PIPELINE_EVENT_LIMIT = 500
+
+
+def _compute_pg_settings() -> Optional[Dict[str, Any]]:
+    """Connection settings for the document-events store, if configured."""
+    host = os.getenv("EDI_PG_HOST")
+    if not host:
+        return None
+    return {
+        "host": host,
+        "port": int(os.getenv("EDI_PG_PORT", "5432")),
+        "dbname": os.getenv("EDI_PG_DB", "edi"),
+        "user": os.getenv("EDI_PG_USER", "postgres"),
+        "password": os.getenv("EDI_PG_PASSWORD", ""),
+        "sslmode": os.getenv("EDI_PG_SSLMODE", "prefer"),
+    }
+
+
+# Env vars don't change within a process; parse them once at import
+# instead of running the getenv/int/default dance on every rerun and poll.
+_PG_CFG: Optional[Dict[str, Any]] = _compute_pg_settings()
+
+
+def _pg_settings() -> Optional[Dict[str, Any]]:
+    return _PG_CFG
+
+
+_PG_READY = _PG_CFG is not None
+
+
+def _pg_is_configured() -> bool:
+    return _PG_READY
+
+
+@st.cache_resource(show_spinner=False)
+def _pg_pool():
+    """Process-wide connection pool for pipeline polling.
+
+    The tracking loop queries Postgres every few seconds; a fresh
+    psycopg.connect() per poll would repay the TCP+TLS+auth handshake on
+    each iteration. Checking connections out of a shared pool makes the
+    per-poll cost one round-trip. Returns None when Postgres is not
+    configured.
+    """
+    cfg = _pg_settings()
+    if cfg is None:
+        return None
+
+    from psycopg.rows import dict_row
+    from psycopg_pool import ConnectionPool
+
+    conninfo = " ".join(f"{k}={v}" for k, v in cfg.items() if v != "")
+    return ConnectionPool(
+        conninfo,
+        min_size=1,
+        max_size=4,
+        timeout=8,
+        num_workers=1,
+        kwargs={"row_factory": dict_row},
+    )
+
+
+def _fetch_events_by_filename(
+    filename: str, limit: int = _PIPELINE_EVENT_LIMIT
+) -> List[Dict[str, Any]]:
+    """Resolve the document and fetch its events in one round-trip.
+
+    Joining documents to document_events replaces the earlier id-lookup
+    plus events-fetch pair, halving network hops per poll; prepare=True
+    lets psycopg reuse the server-side plan across iterations. The
+    lookup is an exact match (no ILIKE scan), so the documents side is
+    index-searchable with::
+
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS documents_ofn_idx
+            ON documents (original_filename);
+    """
+    pool = _pg_pool()
+    if pool is None:
+        return []
+    query = (
+        "SELECT de.document_id, de.stage, de.status, de.event_time, "
+        "de.details, de.progress "
+        "FROM documents d "
+        "JOIN document_events de ON de.document_id = d.document_id "
+        "WHERE d.original_filename = %s "
+        "ORDER BY de.event_time ASC LIMIT %s"
+    )
+    try:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                # binary=True: timestamps and numerics arrive in the wire
+                # format instead of text, skipping the server-side render
+                # and client-side parse per value.
+                cur.execute(query, (filename, limit), prepare=True, binary=True)
+                # dict_row already yields plain dicts; no per-row copy.
+                return cur.fetchall()
+    except Exception:  # noqa: BLE001
+        return []
+
+
+def _fetch_document_events(
+    document_id: str, after: Any = None, limit: int = _PIPELINE_EVENT_LIMIT
+) -> List[Dict[str, Any]]:
+    """Fetch events for a document, optionally only those after a watermark.
+
+    Passing the last seen event_time turns each poll into a delta fetch:
+    rows already rendered never cross the wire again. For an index range
+    scan instead of a sort, the events table wants::
+
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS document_events_doc_time_idx
+            ON document_events (document_id, event_time);
+    """
+    pool = _pg_pool()
+    if pool is None:
+        return []
+    cols = "document_id, stage, status, event_time, details, progress"
+    if after is None:
+        query = (
+            f"SELECT {cols} FROM document_events "
+            "WHERE document_id = %s "
+            "ORDER BY event_time ASC LIMIT %s"
+        )
+        params: tuple = (document_id, limit)
+    else:
+        query = (
+            f"SELECT {cols} FROM document_events "
+            "WHERE document_id = %s AND event_time > %s "
+            "ORDER BY event_time ASC LIMIT %s"
+        )
+        params = (document_id, after, limit)
+    try:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params, prepare=True, binary=True)
+                return cur.fetchall()
+    except Exception:  # noqa: BLE001
+        return []
+
+
+def _fetch_latest_per_stage(document_id: str) -> List[Dict[str, Any]]:
+    """Fetch only the latest event per stage, reduced server-side.
+
+    DISTINCT ON collapses the timeline to O(#stages) rows before it
+    crosses the wire — used for the settled final render, where the full
+    history is not needed. The live loop keeps the Python reduction
+    instead, since it works incrementally off the delta accumulator.
+    """
+    pool = _pg_pool()
+    if pool is None:
+        return []
+    query = (
+        "SELECT * FROM ("
+        "SELECT DISTINCT ON (stage) document_id, stage, status, event_time, "
+        "details, progress "
+        "FROM document_events WHERE document_id = %s "
+        "ORDER BY stage, event_time DESC"
+        ") t ORDER BY event_time ASC"
+    )
+    try:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (document_id,), prepare=True, binary=True)
+                return cur.fetchall()
+    except Exception:  # noqa: BLE001
+        return []
+
+
+_STEP_KEYS = ("stage", "step", "step_name", "name", "event")
+_STATUS_KEYS = ("status", "state", "result", "outcome")
+
+
+def _infer_step_name(ev: Dict[str, Any]) -> str:
+    for key in _STEP_KEYS:
+        val = ev.get(key)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return "unknown"
+
+
+def _infer_status(ev: Dict[str, Any]) -> str:
+    for key in _STATUS_KEYS:
+        val = ev.get(key)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return "unknown"
+
+
+def _specialized_get(ev: Dict[str, Any], key: Optional[str], generic) -> str:
+    """Read a field via the key learned from the first event.
+
+    Rows from one pipeline share a schema, so after the first event the
+    winning key is known and extraction is a single dict probe; anything
+    unexpected falls back to the generic multi-key scan.
+    """
+    if key is not None:
+        val = ev.get(key)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return generic(ev)
+
+
+_TIME_KEYS = ("event_time", "created_at", "timestamp", "time", "ts")
+
+
+def _event_time_key(ev: Dict[str, Any]) -> str:
+    val = next((ev[k] for k in _TIME_KEYS if k in ev), None)
+    return "" if val is None else str(val)
+
+
+# Status-string → bucket table, built once at import; per-event
+# classification is then a dict probe instead of lowercasing plus chained
+# set-membership tests.
+_BUCKET_MAP: Dict[str, str] = {}
+for _bucket, _names in (
+    ("ok", ("ok", "success", "succeeded", "done", "completed", "processed", "delivered")),
+    ("error", ("error", "failed", "failure", "exception", "rejected")),
+    ("running", ("running", "processing", "in_progress", "started", "queued", "pending")),
+):
+    for _name in _names:
+        _BUCKET_MAP[_name] = _bucket
+del _bucket, _names, _name
+
+_SYMBOLS = {"ok": "✅", "error": "❌", "running": "⏳"}
+
+
+def _status_bucket(status: Optional[str]) -> str:
+    if not status:
+        return "unknown"
+    # Most statuses arrive lowercase already; only fall back to .lower()
+    # (and its string allocation) when the direct probe misses.
+    return _BUCKET_MAP.get(status) or _BUCKET_MAP.get(status.lower(), "unknown")
+
+
+def _symbol(bucket: str) -> str:
+    return _SYMBOLS.get(bucket, "▫️")
+
+
+def _render_pipeline(
+    events: List[Dict[str, Any]],
+) -> Tuple[List[str], Dict[str, Dict[str, Any]], int]:
+    """Render one row per pipeline step, keeping the latest event per step.
+
+    Returns the step order, the latest event per step, and the count of
+    steps whose latest status bucketed as "ok" — progress falls out of the
+    same pass that builds the table rows.
+    """
+    # Events arrive ORDER BY event_time from SQL (and webhook payloads are
+    # emitted in order); a Python-side re-sort would only copy the list.
+    step_key = status_key = None
+    if events:
+        first = events[0]
+        step_key = next((k for k in _STEP_KEYS if k in first), None)
+        status_key = next((k for k in _STATUS_KEYS if k in first), None)
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    order: List[str] = []
+    for ev in events:
+        step = _specialized_get(ev, step_key, _infer_step_name)
+        if step not in latest:
+            order.append(step)
+        latest[step] = ev
+
+    # One st.dataframe instead of st.columns + writes per step: a single
+    # protocol message rather than ~4 widget creations per row. The list
+    # of dicts goes to st.dataframe directly, as on the tracker page.
+    ok_count = 0
+    if order:
+        rows = []
+        for step in order:
+            ev = latest[step]
+            status = _specialized_get(ev, status_key, _infer_status)
+            bucket = _status_bucket(status)
+            if bucket == "ok":
+                ok_count += 1
+            rows.append(
+                {
+                    "": _symbol(bucket),
+                    "Step": step,
+                    "Status": status,
+                    "Time": _event_time_key(ev),
+                    "Details": str(ev.get("details") or ev.get("message") or ""),
+                }
+            )
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+    return order, latest, ok_count
+
+
+def _wait_for_change(document_id: Optional[str], timeout_s: float) -> bool:
+    """Wait briefly for new pipeline activity for this document.
+
+    Listens on the ``doc_events`` channel, fed by an AFTER INSERT trigger
+    on document_events that runs ``NOTIFY doc_events,
+    NEW.document_id::text``. Returns True when a matching notification
+    arrived within the timeout, False otherwise (including when Postgres
+    or the trigger is unavailable).
+    """
+    pool = _pg_pool()
+    if pool is None or document_id is None:
+        return False
+    try:
+        with pool.connection() as conn:
+            conn.autocommit = True
+            try:
+                conn.execute("LISTEN doc_events")
+                for notify in conn.notifies(timeout=min(timeout_s, 20.0)):
+                    if notify.payload == document_id:
+                        return True
+            finally:
+                # The pool's reset only rolls back open transactions; it
+                # neither UNLISTENs nor restores autocommit. Without this
+                # the connection would go back subscribed, piling
+                # notifications into buffers of later plain-SELECT
+                # checkouts and causing stale wakeups on future runs.
+                conn.execute("UNLISTEN *")
+                for _ in conn.notifies(timeout=0):
+                    pass
+                conn.autocommit = False
+    except Exception:  # noqa: BLE001
+        pass
+    return False
+
+
+def _status_webhook_url() -> Optional[str]:
+    # Resolved once at client construction alongside the other webhooks;
+    # no per-poll env lookup or string work.
+    return get_default_client().webhooks.status
+
+
+def _webhook_events(
+    client, poll_url: str, filename: str, wait_seconds: int = 0
+) -> List[Dict[str, Any]]:
+    # wait_seconds lets a long-poll-aware n8n workflow hold the request
+    # open until there is progress; workflows that ignore it just answer
+    # immediately and the loop's own pacing applies.
+    try:
+        payload = client.unwrap_payload(
+            client.call_webhook(
+                poll_url, {"filename": filename, "wait_seconds": wait_seconds}
+            )
+        )
+    except Exception:  # noqa: BLE001
+        return []
+    if isinstance(payload, dict):
+        events = payload.get("events")
+        if isinstance(events, list):
+            return [e for e in events if isinstance(e, dict)]
+    return []
+
+
+def _is_done(payload: Any) -> bool:
+    """True when a webhook payload already reports a terminal state."""
+    if not isinstance(payload, dict):
+        return False
+    return _status_bucket(_infer_status(payload)) in ("ok", "error")
+
+
+def _start_tracking(filename: str, use_db: bool, max_wait_s: float) -> None:
+    """Arm pipeline tracking for this file (or record an already-known end).
+
+    If the ingest response already carried a terminal status, the answer
+    is known: record the outcome directly and never start the fragment.
+    Otherwise reset the event accumulator and store the tracking state the
+    fragment ticks against.
+    """
+    state = st.session_state
+    stored = state.get("last_upload_resp")
+    resp = (
+        stored["payload"]
+        if isinstance(stored, dict) and stored.get("filename") == filename
+        else None
+    )
+    # Pick whichever payload actually carries the terminal status (the
+    # workflow may nest it under "result") and read it from there too.
+    terminal: Optional[Dict[str, Any]] = None
+    if _is_done(resp):
+        terminal = resp
+    elif isinstance(resp, dict) and _is_done(resp.get("result")):
+        terminal = resp["result"]
+    if terminal is not None:
+        status = _infer_status(terminal)
+        state["pipeline_track"] = {
+            "filename": filename,
+            "use_db": use_db,
+            "active": False,
+            "outcome": "complete" if _status_bucket(status) == "ok" else "failed",
+            "status": status,
+        }
+        return
+    state["events_doc"] = filename
+    state["events_acc"] = []
+    state["events_hwm"] = None
+    state["pipeline_track"] = {
+        "filename": filename,
+        "use_db": use_db,
+        "active": True,
+        "deadline": time.monotonic() + float(max_wait_s),
+    }
+
+
+def _poll_pipeline_once(client, track: Dict[str, Any], interval_s: float) -> None:
+    """One poll-and-render tick of the pipeline fragment.
+
+    Runs inside an ``@st.fragment(run_every=...)`` wrapper: each tick
+    reruns only this body while the rest of the page stays interactive,
+    instead of a blocking while-loop holding the script thread for the
+    whole wait. The fragment replaces its own output on every rerun, so
+    the tick renders unconditionally and needs no placeholder or
+    change-detection bookkeeping.
+    """
+    filename = track["filename"]
+    state = st.session_state
+    # Once resolved, the filename→document_id mapping is stable; remember
+    # it across reruns so polling can use the cheaper direct-id query.
+    resolved: Dict[str, str] = state.setdefault("resolved_document_id", {})
+    document_id: Optional[str] = resolved.get(filename)
+
+    if track["use_db"]:
+        if document_id is None:
+            batch = _fetch_events_by_filename(filename)
+            if batch:
+                document_id = str(batch[0]["document_id"])
+                resolved[filename] = document_id
+        else:
+            # Accumulated events plus the high-watermark event_time: each
+            # poll appends only the delta instead of the whole history.
+            batch = _fetch_document_events(document_id, after=state["events_hwm"])
+        if batch:
+            state["events_acc"].extend(batch)
+            state["events_hwm"] = batch[-1].get("event_time")
+        events = state["events_acc"]
+    else:
+        # The interval doubles as the long-poll hint: a wait-aware
+        # workflow holds the request open until there is progress, so the
+        # answer lands at the start of the tick instead of one tick late.
+        events = _webhook_events(client, _status_webhook_url(), filename, int(interval_s))
+
+    if events:
+        st.info(f"Tracking {document_id or filename} — {len(events)} events")
+        order, _latest, ok = _render_pipeline(events)
+        if order:
+            p = ok / len(order)
+            if p >= 1.0:
+                track["active"] = False
+                track["outcome"] = "complete"
+                st.rerun()
+            st.progress(p)
+    else:
+        st.info("Waiting for pipeline events…")
+
+    if time.monotonic() >= track["deadline"]:
+        track["active"] = False
+        track["outcome"] = "timeout"
+        st.rerun()
+
+    # LISTEN/NOTIFY is the fast path: a short bounded listen lets a fresh
+    # event trigger an immediate fragment rerun, leaving run_every as the
+    # fallback heartbeat for quiet channels.
+    if track["use_db"] and document_id is not None:
+        if _wait_for_change(document_id, 1.0):
+            st.rerun(scope="fragment")
+
+
+def _show_final(track: Dict[str, Any]) -> None:
+    """Render the settled outcome of a finished tracking run."""
+    state = st.session_state
+    events = state["events_acc"] if state.get("events_doc") == track["filename"] else []
+    if not events:
+        # One fetch, then memoized in the accumulator for later reruns.
+        if track["use_db"]:
+            # With a known document id only the latest row per stage
+            # comes back — exactly what the settled table shows anyway.
+            document_id = state.get("resolved_document_id", {}).get(track["filename"])
+            if document_id is not None:
+                events = _fetch_latest_per_stage(document_id)
+            else:
+                events = _fetch_events_by_filename(track["filename"])
+        else:
+            # Webhook mode never fills the accumulator, and the full-app
+            # rerun wiped the fragment's table; refetch it once so the
+            # settled view keeps the pipeline, not just the verdict line.
+            poll_url = _status_webhook_url()
+            if poll_url:
+                events = _webhook_events(get_default_client(), poll_url, track["filename"])
+        state["events_doc"] = track["filename"]
+        state["events_acc"] = events
+    if events:
+        _render_pipeline(events)
+    status = track.get("status")
+    outcome = track.get("outcome")
+    if outcome == "complete":
+        st.success(f"Pipeline complete ({status})" if status else "Pipeline complete")
+    elif outcome == "failed":
+        st.error(f"Pipeline failed ({status})" if status else "Pipeline failed")
+    else:
+        st.warning("Stopped waiting for pipeline completion.")
 
 
 def render() -> None:
@@ -27,29 +528,82 @@ def render() -> None:
     if uploaded is None:
         return
 
-    content = uploaded.getvalue()
+    # One clock read + isoformat per rerun, shared by the upload record
+    # and the tracking-run marker below.
+    now_iso = datetime.now(timezone.utc).isoformat()
+
     record = {
         "name": uploaded.name,
-        "size_bytes": len(content),
-        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        "size_bytes": uploaded.size,
+        "uploaded_at": now_iso,
     }
 
     st.session_state.setdefault("uploaded_files", [])
     st.session_state.uploaded_files.append(record)
 
-    st.success(f"Uploaded: {uploaded.name} ({len(content)} bytes)")
+    st.success(f"Uploaded: {uploaded.name} ({uploaded.size} bytes)")
     st.json(record)
 
-    webhook = os.getenv("N8N_INGEST_WEBHOOK_URL")
+    client = get_default_client()
+    webhook = client.webhooks.ingest
     if webhook:
         if st.button("Forward to n8n", type="primary"):
-            client = N8NClient()
-            payload = {"filename": uploaded.name, "size_bytes": len(content)}
             try:
-                resp = client.call_webhook(webhook, payload)
+                uploaded.seek(0)
+                resp = client.call_webhook_file(webhook, uploaded, uploaded.name)
+                # Keep the response: if the workflow runs synchronously it
+                # already says how the pipeline ended, and tracking below
+                # can short-circuit instead of polling for a known answer.
+                st.session_state["last_upload_resp"] = {
+                    "filename": uploaded.name,
+                    "payload": client.unwrap_payload(resp),
+                }
                 st.success("Forwarded to n8n webhook")
                 st.json(resp)
             except Exception as e:  # noqa: BLE001
                 st.error(f"n8n webhook call failed: {e}")
     else:
         st.caption("Set N8N_INGEST_WEBHOOK_URL to enable forwarding.")
+
+    st.divider()
+    st.subheader("Processing pipeline")
+
+    use_db = st.toggle(
+        "Poll Postgres for pipeline events",
+        value=_PG_READY,
+        disabled=not _PG_READY,
+    )
+    controls = st.columns(2)
+    interval_s = controls[0].number_input(
+        "Poll interval (s)", min_value=1, max_value=30, value=_PIPELINE_POLL_INTERVAL_S
+    )
+    max_wait_s = controls[1].number_input(
+        "Max wait (s)", min_value=10, max_value=600, value=_PIPELINE_MAX_WAIT_S
+    )
+
+    can_track = use_db or _status_webhook_url() is not None
+    if not can_track:
+        st.caption("Set EDI_PG_* or N8N_STATUS_WEBHOOK_URL to enable pipeline tracking.")
+        return
+
+    if st.button("Track processing"):
+        st.session_state["last_upload_run"] = {
+            "filename": uploaded.name,
+            "started_at": now_iso,
+        }
+        _start_tracking(uploaded.name, use_db, float(max_wait_s))
+
+    track = st.session_state.get("pipeline_track")
+    if not track or track.get("filename") != uploaded.name:
+        return
+    if track["active"]:
+        # run_every is fixed at decoration time, so the fragment is built
+        # here with the current widget value; each tick reruns only the
+        # fragment body while the rest of the page stays interactive.
+        @st.fragment(run_every=float(interval_s))
+        def _pipeline_fragment() -> None:
+            _poll_pipeline_once(client, track, float(interval_s))
+
+        _pipeline_fragment()
+    else:
+        _show_final(track)
@@ -7,7 +7,7 @@ from typing import Any, Dict, Optional
 from api.n8n_client import N8NClient
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LiveStatus:
     ok: bool
     checked_at: datetime